@@ -0,0 +1,72 @@
+"""Numba kernels for plot_results.py, with NumPy fallbacks when numba is missing"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional: NumPy fallbacks below
+    njit = None
+
+# fastmath without "nnan"/"ninf", so the finite checks are not folded away
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+if njit is not None:
+    # cache=True keeps the compiled code in __pycache__ across runs
+    _jit = njit(cache=True, fastmath=_FASTMATH, boundscheck=False)
+
+
+def err_stats(a):
+    """Sum of squares, max, sum and count of the finite entries of a, in one pass"""
+    ss = 0.0
+    m = 0.0
+    s = 0.0
+    c = 0
+    for i in range(a.size):
+        v = a[i]
+        if np.isfinite(v):
+            c += 1
+            s += v
+            ss += v * v
+            if v > m:
+                m = v
+    return ss, m, s, c
+
+
+if njit is not None:
+    err_stats = _jit(err_stats)
+else:
+    def err_stats(a):
+        a = a[np.isfinite(a)]
+        return float(np.dot(a, a)), float(a.max(initial=0.0)), float(a.sum()), a.size
+
+
+def clip_min_max(a, eps):
+    """max(a, eps) elementwise, plus the min and max of the result, in one pass"""
+    out = np.empty_like(a)
+    lo = np.inf
+    hi = -np.inf
+    for i in range(a.size):
+        v = a[i] if a[i] > eps else eps
+        out[i] = v
+        if v < lo:
+            lo = v
+        if v > hi:
+            hi = v
+    return out, lo, hi
+
+
+if njit is not None:
+    clip_min_max = _jit(clip_min_max)
+else:
+    def clip_min_max(a, eps):
+        out = np.maximum(a, eps)
+        return out, out.min(initial=np.inf), out.max(initial=-np.inf)
+
+
+if njit is not None:
+    # compile (or load from cache) the float64 specializations at import,
+    # before the first real call
+    _warm = np.zeros(4)
+    err_stats(_warm)
+    clip_min_max(_warm, 1e-20)
+    del _warm
@@ -1,10 +1,177 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import numpy as np
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def plot_results(csv_file, method_name):
+from _kernels import clip_min_max, err_stats
+
+try:
+    import numexpr as ne
+except ImportError:  # optional: fall back to plain NumPy
+    ne = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    _CSV_ENGINE = "pyarrow"
+except ImportError:  # optional: default single-threaded C parser
+    pa = pa_csv = None
+    _CSV_ENGINE = "c"
+
+# lines with more points than this are rasterized in the PDF instead of
+# being embedded as vector paths
+_RASTER_MIN_POINTS = 2000
+_SAVE_DPI = 150
+
+# rows per chunk when streaming a CSV without pyarrow
+_CHUNK_ROWS = 1 << 16
+
+# parse straight to float64; bad cells become NaN without a to_numeric pass
+_CSV_DTYPES = {"x": "float64", "t": "float64", "u_numeric": "float64", "u_exact": "float64"}
+_NA_VALUES = ["", "nan", "NaN", "inf", "-inf", "Inf", "-Inf"]
+
+# the CSV error column (and anything else) is recomputed or unused: never parse it
+_CSV_COLUMNS = list(_CSV_DTYPES)
+
+
+def _coerce(df):
+    """Coerce the solution columns of a loosely parsed frame to numbers"""
+    for col in ["u_numeric", "u_exact"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def _read_csv(csv_file):
+    """Load a solver CSV, multi-threaded when pyarrow is installed"""
+    try:
+        return pd.read_csv(
+            csv_file,
+            engine=_CSV_ENGINE,
+            usecols=_CSV_COLUMNS,
+            dtype=_CSV_DTYPES,
+            na_values=_NA_VALUES,
+        )
+    except ValueError:
+        # malformed cells the typed parser rejects: parse loosely and coerce
+        return _coerce(pd.read_csv(csv_file, engine=_CSV_ENGINE, usecols=_CSV_COLUMNS))
+
+
+def _iter_csv_chunks(csv_file, typed=True):
+    """Yield a solver CSV as a stream of DataFrames"""
+    if pa_csv is not None:
+        if typed:
+            convert = pa_csv.ConvertOptions(
+                column_types={col: pa.float64() for col in _CSV_DTYPES},
+                null_values=_NA_VALUES,
+                include_columns=_CSV_COLUMNS,
+            )
+        else:
+            # read the solution columns as text so that a bad cell in a later
+            # block cannot break type inference; _coerce turns them into NaN
+            convert = pa_csv.ConvertOptions(
+                column_types={"u_numeric": pa.string(), "u_exact": pa.string()},
+                include_columns=_CSV_COLUMNS,
+            )
+        with pa_csv.open_csv(csv_file, convert_options=convert) as reader:
+            for batch in reader:
+                yield batch.to_pandas()
+    else:
+        kwargs = {"dtype": _CSV_DTYPES, "na_values": _NA_VALUES} if typed else {}
+        yield from pd.read_csv(
+            csv_file, chunksize=_CHUNK_ROWS, usecols=_CSV_COLUMNS, **kwargs
+        )
+
+
+def _abs_error(a, b):
+    """Absolute error |a - b| without extra temporaries"""
+    if ne is not None:
+        return ne.evaluate("abs(a - b)")
+    out = np.subtract(a, b)
+    return np.abs(out, out=out)
+
+
+def _error_norms(a):
+    """(L2, L∞, mean) of the finite entries of a; NaN when there are none"""
+    ss, m, s, c = err_stats(np.ascontiguousarray(a, dtype=np.float64))
+    if c == 0:
+        return float("nan"), float("nan"), float("nan")
+    return float(np.sqrt(ss / c)), float(m), float(s / c)
+
+
+def _add_error(df):
+    """Recompute the error column, ignoring any broken error column in the CSV"""
+    # non-finite values propagate as NaN/inf and are masked with np.isfinite by callers
+    df["error"] = _abs_error(df["u_numeric"].to_numpy(), df["u_exact"].to_numpy())
+    return df
+
+
+def _scan_final_layer(chunks):
+    """Concatenate the rows at the maximum t of a stream of chunks, sorted by x"""
+    # keep just the rows at the running maximum of t, so memory stays
+    # O(N_x) instead of holding the whole (N_t, N_x) table
+    t_max = -np.inf
+    kept = []
+    for chunk in chunks:
+        chunk_max = chunk["t"].max()
+        if chunk_max > t_max:
+            t_max, kept = chunk_max, []
+        if chunk_max == t_max:
+            kept.append(chunk[chunk["t"] == t_max])
+
+    if not kept:
+        return pd.DataFrame({col: np.empty(0) for col in _CSV_DTYPES})
+    return pd.concat(kept, ignore_index=True).sort_values("x")
+
+
+def _load_final_layer(csv_file):
+    """Read only the rows of the last time layer, sorted by x"""
+    try:
+        final_data = _scan_final_layer(_iter_csv_chunks(csv_file))
+    except ValueError:
+        # malformed cells the typed parser rejects: parse loosely and coerce
+        final_data = _coerce(_scan_final_layer(_iter_csv_chunks(csv_file, typed=False)))
+    return _add_error(final_data)
+
+
+def _to_grids(df):
+    """Sorted x/t axes and (N_t, N_x) grids of u_numeric and u_exact"""
+    df = df.sort_values(["t", "x"], kind="mergesort", ignore_index=True)
+    x_col = df["x"].to_numpy()
+    x_vals = np.unique(x_col)
+    n_x = len(x_vals)
+    n_t = len(df) // n_x if n_x else 0
+
+    # Solver output is a full regular grid: after the sort it is already
+    # row-major (N_t, N_x), so a reshape gives the grids without copying.
+    # Both axes are checked: every row must hold all x values at a single t.
+    if n_x and n_t * n_x == len(df) and (x_col.reshape(n_t, n_x) == x_vals).all():
+        t_grid = df["t"].to_numpy().reshape(n_t, n_x)
+        t_vals = t_grid[:, 0]
+        if (t_grid == t_vals[:, None]).all():
+            return (
+                x_vals,
+                t_vals,
+                df["u_numeric"].to_numpy().reshape(n_t, n_x),
+                df["u_exact"].to_numpy().reshape(n_t, n_x),
+            )
+
+    # irregular file (missing or repeated points): fall back to a pivot,
+    # keeping the last row written for a repeated (t, x) point
+    df = df.drop_duplicates(["t", "x"], keep="last")
+    u_grid = df.pivot(index="t", columns="x", values="u_numeric")
+    return (
+        u_grid.columns.to_numpy(),
+        u_grid.index.to_numpy(),
+        u_grid.to_numpy(),
+        df.pivot(index="t", columns="x", values="u_exact").to_numpy(),
+    )
+
+
+def plot_results(csv_file, method_name, show=True):
     """Plotting graphs from a CSV file"""
 
     if not os.path.exists(csv_file):
@@ -12,19 +179,14 @@ def plot_results(csv_file, method_name):
         return
 
     print(f"Loading data from {csv_file}...")
-    df = pd.read_csv(csv_file)
+    df = _read_csv(csv_file)
+    x_vals, t_vals, U, E = _to_grids(df)
 
-    # --- Recompute error in Python, ignore any broken CSV error column ---
-    for col in ["u_numeric", "u_exact"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    df["error"] = np.abs(df["u_numeric"] - df["u_exact"])
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
-
-    times = sorted(df["t"].unique())
+    times = t_vals
     print(f"Found {len(times)} time layers")
 
     fig = plt.figure(figsize=(16, 10))
+    dense = len(x_vals) > _RASTER_MIN_POINTS
 
     # ==================== Graph 1: Evolution of the solution ====================
     ax1 = plt.subplot(2, 2, 1)
@@ -32,46 +194,52 @@ def plot_results(csv_file, method_name):
     num_snapshots = min(6, len(times))
     snapshot_indices = np.linspace(0, len(times) - 1, num_snapshots, dtype=int)
 
-    cmap = plt.cm.viridis
-    colors = [cmap(i / max(1, num_snapshots - 1)) for i in range(num_snapshots)]
+    colors = plt.cm.viridis(np.linspace(0.0, 1.0, num_snapshots))
 
-    for idx, t_idx in enumerate(snapshot_indices):
-        t = times[t_idx]
-        data = df[df["t"] == t].sort_values("x")
-        ax1.plot(
-            data["x"],
-            data["u_numeric"],
-            color=colors[idx],
-            linewidth=2,
-            label=f"t={t:.3f}",
-        )
+    # all snapshots as one (num_snapshots, N_x, 2) LineCollection -> one artist
+    segs = np.empty((num_snapshots, len(x_vals), 2))
+    segs[:, :, 0] = x_vals
+    segs[:, :, 1] = U[snapshot_indices]
+    ax1.add_collection(
+        LineCollection(segs, colors=colors, linewidths=2, rasterized=dense)
+    )
+    ax1.autoscale_view()
+
+    handles = [Line2D([], [], color=c, linewidth=2) for c in colors]
+    labels = [f"t={t:.3f}" for t in times[snapshot_indices]]
 
     ax1.set_xlabel("x", fontsize=12)
     ax1.set_ylabel("u(x,t)", fontsize=12)
     ax1.set_title(f"Evolution of the solution ({method_name})",
                   fontsize=14, fontweight="bold")
-    ax1.legend(loc="best")
+    ax1.legend(handles, labels, loc="best")
     ax1.grid(True, alpha=0.3)
 
     # ==================== Graph 2: Comparison with analytic ====================
     ax2 = plt.subplot(2, 2, 2)
 
+    # final layer shared by Graphs 2 and 3 and the error statistics; the
+    # error is recomputed here only, ignoring any broken CSV error column
     final_t = times[-1]
-    final_data = df[df["t"] == final_t].sort_values("x")
+    fx, fu, fe = x_vals, U[-1], E[-1]
+    ferr = _abs_error(fu, fe)
+    valid = np.isfinite(ferr)
 
     ax2.plot(
-        final_data["x"],
-        final_data["u_numeric"],
+        fx,
+        fu,
         "b-",
         linewidth=2,
         label="Numerical solution",
+        rasterized=dense,
     )
     ax2.plot(
-        final_data["x"],
-        final_data["u_exact"],
+        fx,
+        fe,
         "r--",
         linewidth=2,
         label="Analytical solution",
+        rasterized=dense,
     )
     ax2.set_xlabel("x", fontsize=12)
     ax2.set_ylabel("u(x,t)", fontsize=12)
@@ -83,14 +251,13 @@ def plot_results(csv_file, method_name):
     # ==================== Graph 3: Error distribution ====================
     ax3 = plt.subplot(2, 2, 3)
 
-    valid = np.isfinite(final_data["error"])
-    x_valid = final_data["x"][valid]
-    err_valid = final_data["error"][valid]
+    x_valid = fx[valid]
+    err_valid = ferr[valid]
 
     # ------- ONLY CHANGE YOU REQUESTED -------
     if len(err_valid) > 0:
         epsilon = 1e-20
-        err_plot = np.maximum(err_valid, epsilon)
+        err_plot, err_lo, err_hi = clip_min_max(err_valid, epsilon)
 
         ax3.plot(
             x_valid,
@@ -99,13 +266,14 @@ def plot_results(csv_file, method_name):
             linewidth=2,
             marker="o",
             markersize=4,
+            rasterized=dense,
         )
         ax3.set_yscale("log")
 
         # make tiny errors visible
         ax3.set_ylim(
-            max(np.min(err_plot) * 0.5, epsilon),
-            np.max(err_plot) * 2
+            max(err_lo * 0.5, epsilon),
+            err_hi * 2
         )
 
     else:
@@ -128,26 +296,21 @@ def plot_results(csv_file, method_name):
     # ==================== Graph 4: Heatmap ====================
     ax4 = plt.subplot(2, 2, 4)
 
-    x_vals = sorted(df["x"].unique())
-    t_vals = sorted(df["t"].unique())
-
     step = max(1, len(t_vals) // 50)
     t_vals_subset = t_vals[::step]
 
-    u_matrix = np.zeros((len(t_vals_subset), len(x_vals)))
+    # float32 is plenty for an 8-bit colormap and halves the bytes rendering moves
+    u_matrix = U[::step].astype(np.float32)
+    np.nan_to_num(u_matrix, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
 
-    for i, t in enumerate(t_vals_subset):
-        data = df[df["t"] == t].sort_values("x")
-        row = pd.to_numeric(data["u_numeric"], errors="coerce").fillna(0.0)
-        u_matrix[i, :] = row.values
-
-    im = ax4.imshow(
+    # uniform grid -> pcolorfast takes its AxesImage path, no bilinear resampling
+    im = ax4.pcolorfast(
+        (x_vals[0], x_vals[-1]),
+        (t_vals_subset[0], t_vals_subset[-1]),
         u_matrix,
-        aspect="auto",
-        origin="lower",
-        extent=[min(x_vals), max(x_vals), min(t_vals_subset), max(t_vals_subset)],
         cmap="hot",
-        interpolation="bilinear",
+        vmin=float(u_matrix.min()),
+        vmax=float(u_matrix.max()),
     )
     ax4.set_xlabel("x", fontsize=12)
     ax4.set_ylabel("t", fontsize=12)
@@ -157,12 +320,7 @@ def plot_results(csv_file, method_name):
     cbar.set_label("u(x,t)", fontsize=10)
 
     # ==================== Global error statistics ====================
-    if len(err_valid) > 0:
-        l2_error = float(np.sqrt(np.mean(err_valid**2)))
-        linf_error = float(np.max(err_valid))
-    else:
-        l2_error = float("nan")
-        linf_error = float("nan")
+    l2_error, linf_error, mean_error = _error_norms(ferr)
 
     fig.suptitle(
         f"Results of numerical solution of the heat equation\n"
@@ -177,46 +335,58 @@ def plot_results(csv_file, method_name):
     base, _ = os.path.splitext(csv_file)
     pdf_file = base + "_plot.pdf"
     png_file = base + "_plot.png"
-    plt.savefig(pdf_file, bbox_inches="tight")
-    plt.savefig(png_file, dpi=300, bbox_inches="tight")
+    # savefig mutates the figure (dpi, canvas), so the two encodes cannot run
+    # on parallel threads; instead share one tight-bbox layout pass between them
+    bbox = fig.get_tightbbox().padded(plt.rcParams["savefig.pad_inches"])
+    fig.savefig(pdf_file, dpi=_SAVE_DPI, bbox_inches=bbox)
+    fig.savefig(png_file, dpi=_SAVE_DPI, bbox_inches=bbox)
     print(f"✓ Figures saved: {pdf_file} and {png_file}")
 
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
     print("\n" + "=" * 60)
     print(f"ERROR STATISTICS (t={final_t:.3f}):")
     print(f"  L2 error:   {l2_error:.8e}")
     print(f"  L∞ error:   {linf_error:.8e}")
-    print(f"  Mean error: {np.mean(err_valid) if len(err_valid)>0 else np.nan:.8e}")
+    print(f"  Mean error: {mean_error:.8e}")
     print("=" * 60)
 
 
-# ---------- Comparison unchanged ----------
-def compare_methods(csv_files, method_names):
+def compare_methods(csv_files, method_names, show=True):
     fig, axes = plt.subplots(2, 2, figsize=(16, 10))
 
     colors = ["blue", "red", "green", "orange"]
     markers = ["o", "s", "^", "d"]
 
-    for idx, (csv_file, method) in enumerate(zip(csv_files, method_names)):
-        if not os.path.exists(csv_file):
-            print(f"WARNING: {csv_file} not found, skipped")
-            continue
+    # only the final layer is compared; stream the files concurrently
+    # (pyarrow releases the GIL while decoding)
+    with ThreadPoolExecutor() as ex:
+        frames = list(ex.map(
+            lambda f: _load_final_layer(f) if os.path.exists(f) else None, csv_files
+        ))
 
-        df = pd.read_csv(csv_file)
+    # analytical overlay, cached from the first file while it is processed
+    x0 = uex0 = None
 
-        for col in ["u_numeric", "u_exact"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df["error"] = np.abs(df["u_numeric"] - df["u_exact"])
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
+    for idx, (csv_file, final_data, method) in enumerate(
+        zip(csv_files, frames, method_names)
+    ):
+        if final_data is None:
+            print(f"WARNING: {csv_file} not found, skipped")
+            continue
 
-        final_t = df["t"].max()
-        final_data = df[df["t"] == final_t].sort_values("x")
+        # the mask is only needed for plotting; the norms skip non-finite values
+        x = final_data["x"].to_numpy()
+        err = final_data["error"].to_numpy()
+        valid = np.isfinite(err)
+        x_valid = x[valid]
+        u_valid = final_data["u_numeric"].to_numpy()[valid]
+        err_valid = err[valid]
 
-        valid = np.isfinite(final_data["error"])
-        x_valid = final_data["x"][valid]
-        u_valid = final_data["u_numeric"][valid]
-        err_valid = final_data["error"][valid]
+        if idx == 0:
+            x0, uex0 = x, final_data["u_exact"].to_numpy()
 
         color = colors[idx]
         marker = markers[idx]
@@ -224,20 +394,13 @@ def compare_methods(csv_files, method_names):
         axes[0, 0].plot(x_valid, u_valid, color=color, linewidth=2, label=method)
         axes[0, 1].plot(x_valid, err_valid, color=color, linewidth=2, marker=marker, markersize=4, label=method)
 
-        l2_error = float(np.sqrt(np.mean(err_valid**2)))
-        linf_error = float(np.max(err_valid))
+        l2_error, linf_error, _ = _error_norms(err)
 
         axes[1, 0].bar(idx, l2_error, color=color)
         axes[1, 1].bar(idx, linf_error, color=color)
 
-    if csv_files:
-        df0 = pd.read_csv(csv_files[0])
-        df0["u_exact"] = pd.to_numeric(df0["u_exact"], errors="coerce")
-        final_t0 = df0["t"].max()
-        final_data0 = df0[df0["t"] == final_t0].sort_values("x")
-        axes[0, 0].plot(
-            final_data0["x"], final_data0["u_exact"], "k--", linewidth=2, label="Analytical"
-        )
+    if x0 is not None:
+        axes[0, 0].plot(x0, uex0, "k--", linewidth=2, label="Analytical")
 
     axes[0, 0].set_xlabel("x")
     axes[0, 0].set_ylabel("u(x,t)")
@@ -265,25 +428,33 @@ def compare_methods(csv_files, method_names):
     plt.tight_layout()
     plt.savefig("methods_comparison.png", dpi=300, bbox_inches="tight")
     print("✓ Method Comparison saved: methods_comparison.png")
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    # --batch: headless Agg backend, save the figures without opening windows
+    batch = "--batch" in sys.argv
+    argv = [arg for arg in sys.argv if arg != "--batch"]
+    if batch:
+        plt.switch_backend("Agg")
+
+    if len(argv) < 2:
         print("Usage:")
-        print("  python plot_results.py <csv_file> [method_name]")
-        print("  python plot_results.py compare <file1> <method1> <file2> <method2> ...")
+        print("  python plot_results.py [--batch] <csv_file> [method_name]")
+        print("  python plot_results.py [--batch] compare <file1> <method1> <file2> <method2> ...")
         sys.exit(1)
 
-    if sys.argv[1] == "compare":
-        if len(sys.argv) < 4 or len(sys.argv) % 2 != 0:
+    if argv[1] == "compare":
+        if len(argv) < 4 or len(argv) % 2 != 0:
             print("ERROR: need pairs <file> <method> for comparison")
             sys.exit(1)
 
-        csv_files = sys.argv[2::2]
-        method_names = sys.argv[3::2]
-        compare_methods(csv_files, method_names)
+        csv_files = argv[2::2]
+        method_names = argv[3::2]
+        compare_methods(csv_files, method_names, show=not batch)
     else:
-        csv_file = sys.argv[1]
-        method_name = sys.argv[2] if len(sys.argv) > 2 else "Unknown"
-        plot_results(csv_file, method_name)
+        csv_file = argv[1]
+        method_name = argv[2] if len(argv) > 2 else "Unknown"
+        plot_results(csv_file, method_name, show=not batch)